@@ -31,12 +31,19 @@ Input file format is automatically discovered.
 Output file format is selectable between pickle, json, yaml, and csv.
 At least three are backed by fast C implementations.
 
+With cache=True, the parsed contents are also kept in a binary pickle 
+sidecar (filename + '.cache') stamped with the source file's mtime and SHA-1.
+Later opens load the sidecar instead of re-parsing the source, until the 
+source is edited.  An optional indexer callable builds lookup tables from 
+the data; these are stored in the sidecar too and exposed as self.indexes.
+
 Based on code from Raymond Hettinger, at 
 http://code.activestate.com/recipes/576642/
 """
 
 import pickle, json, csv
 import os, sys, shutil
+import hashlib
 from datetime import datetime
 
 try:
@@ -48,12 +55,16 @@ except ImportError:
 
 class DictDB(dict):
 
-    def __init__(self, filename, flag=None, mode=None, format=None, verbose=False, *args, **kwds):
+    def __init__(self, filename, flag=None, mode=None, format=None, verbose=False, cache=False, indexer=None, 
+                 *args, **kwds):
         self.flag = flag or 'c'             # r=readonly, c=create, or n=new
         self.mode = mode                    # None or octal triple like 0x666
         self.format = format or 'csv'       # csv, json, yaml, or pickle
         self.filename = filename
         self.verbose = verbose
+        self.cache = cache                  # keep a binary sidecar of the parsed data?
+        self.indexer = indexer              # None or callable(self) returning a dict of lookup tables
+        self.indexes = {}
 
         if (yaml == None) and (format == 'yaml'):
             sys.stderr.write("YAML requested but no YAML library installed, falling back to JSON.\n");
@@ -61,15 +72,28 @@ class DictDB(dict):
             self.format == 'json'
 
         if flag != 'n' and os.access(filename, os.R_OK):
-            file = open(filename, 'rb')
-            #file = codecs.open(filename, 'rb', encoding="utf-8")
-            self._verbose("Reading %s data into memory... \n" % self.format)
-            try:
-                self.load(file)
-            finally:
-                file.close()
-                self._verbose("...done.\n")
+            if not (self.cache and self._loadCache(filename)):
+                file = open(filename, 'rb')
+                #file = codecs.open(filename, 'rb', encoding="utf-8")
+                self._verbose("Reading %s data into memory... \n" % self.format)
+                try:
+                    self.load(file)
+                finally:
+                    file.close()
+                    self._verbose("...done.\n")
+                self.indexes = self.buildIndexes()
+                if self.cache:
+                    self._writeCache(filename)
         self.update(*args, **kwds)
+        if args or kwds or not self.indexes:       # nothing on disk, or more data: (re)build indexes
+            self.indexes = self.buildIndexes()
+
+    def __getstate__(self):
+        """Leave the sidecar cache bookkeeping out of serialized copies of ourself (e.g. YAML dumps)."""
+        state = self.__dict__.copy()
+        for attr in ('cache', 'indexer', 'indexes'):
+            state.pop(attr, None)
+        return state
 
     def _verbose(self, notice):
         """Emits notice with a timestamp onto stderr, if verbose flag is set."""
@@ -99,6 +123,70 @@ class DictDB(dict):
         if self.mode is not None:
             os.chmod(self.filename, self.mode)
         self._verbose("...done.\n")
+        if self.cache:
+            self.indexes = self.buildIndexes()
+            self._writeCache(filename)
+
+    def buildIndexes(self):
+        """Returns the lookup tables made by self.indexer, or an empty dict if there is none."""
+        if self.indexer == None:
+            return {}
+        return self.indexer(self)
+
+    def _signature(self, filename):
+        """Returns (mtime, sha1 hex digest) identifying the current contents of filename."""
+        digest = hashlib.sha1()
+        file = open(filename, 'rb')
+        try:
+            chunk = file.read(1 << 20)
+            while chunk:
+                digest.update(chunk)
+                chunk = file.read(1 << 20)
+        finally:
+            file.close()
+        return (os.stat(filename).st_mtime, digest.hexdigest())
+
+    def _loadCache(self, filename):
+        """Fills self from filename's sidecar if it is still current.  Returns True on success."""
+        cachename = filename + '.cache'
+        if not os.access(cachename, os.R_OK):
+            return False
+        try:
+            file = open(cachename, 'rb')
+            try:
+                cached = pickle.load(file)
+            finally:
+                file.close()
+            if cached['signature'] != self._signature(filename):
+                self._verbose("Cache %s is stale; ignoring it.\n" % cachename)
+                return False
+            self.update(cached['records'])
+            self.indexes = cached['indexes']
+        except Exception:
+            self._verbose("Cache %s is unreadable; ignoring it.\n" % cachename)
+            self.clear()
+            return False
+        if self.indexer != None and not self.indexes:
+            self.indexes = self.buildIndexes()
+        self._verbose("Read %s data from cache %s.\n" % (self.format, cachename))
+        return True
+
+    def _writeCache(self, filename):
+        """Writes our records and indexes to filename's sidecar.  Failure is not fatal; it's only a cache."""
+        cachename = filename + '.cache'
+        tempname = cachename + '.tmp'
+        cached = {'signature': self._signature(filename), 'records': dict(self), 'indexes': self.indexes}
+        try:
+            file = open(tempname, 'wb')
+            try:
+                pickle.dump(cached, file, -1)
+            finally:
+                file.close()
+            shutil.move(tempname, cachename)
+        except (IOError, OSError), msg:
+            self._verbose("Could not write cache %s: %s\n" % (cachename, msg))
+            if os.access(tempname, os.F_OK):
+                os.remove(tempname)
 
     def close(self):
         self.sync()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#########+#########+#########+#########+#########+#########+#########+#########+#########+#########+#########+#########+
+# Copyright (C) 2009  Joe Blaylock <jrbl@jrbl.org>
+#
+#This program is free software: you can redistribute it and/or modify it under 
+#the terms of the GNU General Public License as published by the Free Software 
+#Foundation, either version 3 of the License, or (at your option) any later 
+#version.
+#
+#This program is distributed in the hope that it will be useful, but WITHOUT 
+#ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or 
+#FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more 
+#details.
+#
+#You should have received a copy of the GNU General Public License along with 
+#this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Sorts and groups more records than fit in memory, by spilling sorted runs to disk.
+
+Records are tuples of marshal-able values (strings, numbers, booleans, None).
+They are buffered in memory until the buffer's estimated size passes the
+memory budget; then the buffer is sorted and written out to a temporary run
+file.  Reading back merges all the runs, plus whatever is still buffered,
+into one sorted stream.
+"""
+
+# Imports
+import sys
+import marshal
+import heapq
+import tempfile
+from itertools import groupby
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024          # bytes
+
+
+# Classes
+class ExternalSorter(object):
+    """Accumulates records, then yields them back in sorted order."""
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET, tempdir=None):
+        """memory_budget is the approximate number of bytes of records to hold before spilling."""
+        if memory_budget <= 0:
+            raise ValueError("memory_budget must be a positive number of bytes, not %r" % memory_budget)
+        self.memory_budget = memory_budget
+        self.tempdir = tempdir
+        self.buffer = []
+        self.buffer_size = 0
+        self.runs = []                 # open temporary files, each holding one sorted run
+
+    def add(self, record):
+        """Add a tuple record; spills the buffer to disk if we've gone over budget."""
+        self.buffer.append(record)
+        self.buffer_size += sys.getsizeof(record) + sum([sys.getsizeof(field) for field in record])
+        if self.buffer_size >= self.memory_budget:
+            self._spill()
+
+    def _spill(self):
+        """Sort the buffer and write it out as a new run."""
+        if not self.buffer:
+            return
+        self.buffer.sort()
+        run = tempfile.TemporaryFile(dir=self.tempdir)
+        for record in self.buffer:
+            marshal.dump(record, run)
+        run.seek(0)
+        self.runs.append(run)
+        self.buffer = []
+        self.buffer_size = 0
+
+    def _readRun(self, run):
+        """Yield the records of one run, in order."""
+        while True:
+            try:
+                yield marshal.load(run)
+            except EOFError:
+                return
+
+    def __iter__(self):
+        """Yield every record added so far, in sorted order.  Only good for one pass."""
+        self.buffer.sort()
+        streams = [self._readRun(run) for run in self.runs]
+        streams.append(iter(self.buffer))
+        return heapq.merge(*streams)
+
+    def groups(self, width=1):
+        """Yield (key, records) for runs of records sharing their first width fields, in sorted order."""
+        return groupby(self, key=lambda record: record[:width])
+
+    def close(self):
+        """Throw away the buffer and the temporary files."""
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self.buffer = []
+        self.buffer_size = 0
+
+
+# Test Harness
+if __name__ == "__main__":
+    import random
+    sorter = ExternalSorter(memory_budget=4096)
+    numbers = [(random.randrange(100), str(i)) for i in range(1000)]
+    for record in numbers:
+        sorter.add(record)
+    print "%d runs spilled" % len(sorter.runs)
+    assert list(sorter) == sorted(numbers)
+    sorter.close()
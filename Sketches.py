@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#########+#########+#########+#########+#########+#########+#########+#########+#########+#########+#########+#########+
+# Copyright (C) 2009  Joe Blaylock <jrbl@jrbl.org>
+#
+#This program is free software: you can redistribute it and/or modify it under 
+#the terms of the GNU General Public License as published by the Free Software 
+#Foundation, either version 3 of the License, or (at your option) any later 
+#version.
+#
+#This program is distributed in the hope that it will be useful, but WITHOUT 
+#ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or 
+#FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more 
+#details.
+#
+#You should have received a copy of the GNU General Public License along with 
+#this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Small, mergeable probabilistic summaries for counting over very large archives.
+
+HyperLogLog estimates how many distinct items it has seen, using a fixed
+2**precision bytes of memory, with a relative standard error of about
+1.04/sqrt(2**precision).
+
+CountMinSketch estimates how many times each item has been seen.  It never
+undercounts; it overcounts by at most e/width * (total count) with
+probability 1 - exp(-depth).
+
+Sketches with the same dimensions can be merged - e.g. to combine shards
+of an archive processed separately, or runs made at different times - and
+are plain picklable objects, so they keep fine in a DictDB.
+"""
+
+# Imports
+import math
+import struct
+import hashlib
+
+MASK64 = (1 << 64) - 1
+
+
+# Utility Functions
+def hash64(item):
+    """Returns two independent 64-bit hashes of item.  Non-strings are hashed by their repr()."""
+    if isinstance(item, unicode):
+        item = item.encode("utf-8")
+    elif not isinstance(item, str):
+        item = repr(item)
+    return struct.unpack('>QQ', hashlib.sha1(item).digest()[:16])
+
+
+# Classes
+class HyperLogLog(object):
+    """Estimates the number of distinct items added."""
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16, not %r" % precision)
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, item):
+        x = hash64(item)[0]
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Fold other's items into ours, as if they had all been added here."""
+        if other.precision != self.precision:
+            raise ValueError("Can't merge HyperLogLogs of precision %d and %d" % (self.precision, other.precision))
+        for i in range(self.m):
+            if other.registers[i] > self.registers[i]:
+                self.registers[i] = other.registers[i]
+
+    def count(self):
+        """Returns the estimated number of distinct items added."""
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum([2.0 ** -r for r in self.registers])
+        zeros = len([r for r in self.registers if r == 0])
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(float(m) / zeros)     # linear counting does better on small sets
+        return int(round(estimate))
+
+    def standardError(self):
+        """Returns the relative standard error of count()."""
+        return 1.04 / math.sqrt(self.m)
+
+
+class CountMinSketch(object):
+    """Estimates how many times each item has been added."""
+
+    def __init__(self, width=2048, depth=5):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = [[0] * width for i in range(depth)]
+
+    def _cells(self, item):
+        h1, h2 = hash64(item)
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        for row, cell in enumerate(self._cells(item)):
+            self.table[row][cell] += count
+        self.total += count
+
+    def estimate(self, item):
+        """Returns an estimate of item's count; never too low."""
+        return min([self.table[row][cell] for row, cell in enumerate(self._cells(item))])
+
+    def merge(self, other):
+        """Fold other's counts into ours, as if they had all been added here."""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Can't merge CountMinSketches of different dimensions")
+        for row in range(self.depth):
+            ours = self.table[row]
+            theirs = other.table[row]
+            for cell in range(self.width):
+                ours[cell] += theirs[cell]
+        self.total += other.total
+
+    def errorBound(self):
+        """Returns the most estimate() should overcount by, with probability confidence()."""
+        return math.e / self.width * self.total
+
+    def confidence(self):
+        return 1 - math.exp(-self.depth)
+
+
+# Test Harness
+if __name__ == "__main__":
+    hll = HyperLogLog()
+    other = HyperLogLog()
+    for i in range(50000):
+        hll.add("user%d" % i)
+        other.add("user%d" % (i + 25000))
+    print "HLL: ~%d of 50000 distinct, std err %.2f%%" % (hll.count(), 100 * hll.standardError())
+    hll.merge(other)
+    print "merged HLL: ~%d of 75000 distinct" % hll.count()
+
+    cms = CountMinSketch()
+    for i in range(10000):
+        cms.add("user%d" % (i % 500))
+    print "CMS: user7 ~%d of 20, overcount at most %.1f with p=%.3f" % (cms.estimate("user7"), cms.errorBound(), 
+                                                                       cms.confidence())
@@ -25,7 +25,9 @@ Attributes:
  addNick(nick): a method adding an alternate common name to UserObj.nicks
  
 Also takes pains to cache data between uses, caching the UUIDs and names 
-in a user-editable YAML file, and the UserObjs into a cPickle.
+in a user-editable YAML file, and the UserObjs into a cPickle.  The parsed 
+YAML and its name indexes are kept in a binary sidecar next to the YAML file 
+(cf. DictDB), so it is only re-parsed after someone edits it.
 
 YAML file format:
   uid-string:
@@ -41,6 +43,38 @@ from DictDB import DictDB
 from UserStats import UserStats
 from EasyIO import ewrite
 
+def indexesFromYAML(yaml_data):
+    """Build name -> id lookup tables for data in our YAML file format.
+
+    Returns a dictionary with one table per name field:
+      'real name': maps non-empty real names to ids
+      'irc': maps non-empty irc nicks to ids
+      'wiki': maps wiki userids to ids
+    Passed to DictDB as an indexer, so the tables get cached along with the data.
+    Missing, empty or malformed fields are skipped; validate_yaml reports on those.
+    """
+    def names(field):
+        """The usable names in field, which hand-edited records may leave empty or malformed."""
+        if isinstance(field, (basestring, int, long)):
+            field = [field]
+        if not isinstance(field, list):
+            return []
+        return [name for name in field if isinstance(name, (basestring, int, long))]
+
+    indexes = {'real name': {}, 'irc': {}, 'wiki': {}}
+    for id in yaml_data:
+        record = yaml_data[id]
+        if not isinstance(record, dict): continue
+        real_name = record.get('real name')
+        if isinstance(real_name, basestring) and real_name != '':
+            indexes['real name'][real_name] = id
+        for nick in names(record.get('irc')):
+            if nick == '': continue
+            indexes['irc'][nick] = id
+        for name in names(record.get('wiki')):
+            indexes['wiki'][name] = id
+    return indexes
+
 class UserTable(object):
     """Maps common names to UUIDs and UUIDs to user objects"""
 
@@ -53,7 +87,8 @@ class UserTable(object):
         self.verbose = verbose
 
         self.__userObjectTable = DictDB(user_objects_db, flag='c', format='pickle', verbose=self.verbose)
-        self.__yaml_data = DictDB(mapping_yaml, flag='c', format='yaml', verbose=self.verbose)
+        self.__yaml_data = DictDB(mapping_yaml, flag='c', format='yaml', verbose=self.verbose, 
+                                  cache=True, indexer=indexesFromYAML)
 
         # Set last_id higher than anything we've seen (necessary with sequential uids, not uuids)
         # XXX: oh my gods, this is crazy.  But at least it's user-editable, I guess?
@@ -77,8 +112,6 @@ class UserTable(object):
                 nicks = self.__yaml_data[id]['irc']
             except KeyError, msg:
                 ewrite("Error: IRC nicks missing from yaml data file %s at key %s\n" % (mapping_yaml, id))
-            if real_name != '':
-                self.__commonNames[real_name] = id
             if id not in self.__userObjectTable:
                 user_object = UserStats( nicks[0], -1, id ) # XXX: should timestamp properly
                 for nick in nicks: 
@@ -87,9 +120,10 @@ class UserTable(object):
                 self.__userObjectTable[id] = user_object
             for nick in nicks:
                 if nick == '': continue
-                self.__commonNames[nick] = id
                 if nick not in self.__userObjectTable[id].nicks:
                     self.__userObjectTable[id].nicks.append(nick)
+        self.__commonNames.update(self.__yaml_data.indexes['real name'])
+        self.__commonNames.update(self.__yaml_data.indexes['irc'])
 
     def getID(self):
         """Gets the next number in the ID sequence.  NOT THREAD SAFE"""